@@ -1,5 +1,5 @@
 import re
-from typing import Any
+from typing import Any, Optional, Tuple
 
 
 class CircularReferenceError(ReferenceError):
@@ -8,25 +8,34 @@ class CircularReferenceError(ReferenceError):
 
 
 ############################################
-# 1) Regex to specifically determine if the entire string is a reference
+# Regex matching every reference within the text: `${ref_path:default?}` or `$ref_path:default?$`
+# A string whose single match spans the whole text is a "full reference";
+# the `${...}` form may additionally carry a trailing `$` (e.g. `${a.b}$`).
 ############################################
+PARTIAL_REF_PATTERN = re.compile(
+    r'(\${([^}:]+(?:\.[^}:]+)*)(?::([^}]+))?})'
+    r'|(\$([^$:]+(?:\.[^$:]+)*)(?::([^$]+))?\$)'
+)
+# Anchored variant (same group layout) used when the first match alone does not decide a full reference;
+# unlike `search`, `fullmatch` backtracks into the `$...$` alternative, e.g. `${.}1.:0$`
 FULL_REF_PATTERN = re.compile(
-    r'^('  # Start capturing group
-    r'\${([^}:]+(?:\.[^}:]+)*)(?::([^}]+))?}'  # \${ ref_path : default? }
-    r'(\$)?'  # Optional trailing $
-    r'|'  # OR
-    r'\$([^$:]+(?:\.[^$:]+)*)(?::([^$]+))?\$'  # \$ ref_path : default? \$
-    r')$'  # End capturing group
+    r'(\${([^}:]+(?:\.[^}:]+)*)(?::([^}]+))?})\$?'
+    r'|(\$([^$:]+(?:\.[^$:]+)*)(?::([^$]+))?\$)'
 )
+# Bound once so hot calls skip the attribute lookup on the compiled pattern
+_search_ref = PARTIAL_REF_PATTERN.search
+_sub_refs = PARTIAL_REF_PATTERN.sub
+_fullmatch_ref = FULL_REF_PATTERN.fullmatch
 
 ############################################
-# 2) Regex for "partial replacement"
-#    Matches all sub-references within the text
+# Diagnostic paths are tuples of segments, rendered by `_format_path` only when an error is raised:
+#   dict key -> `.key`, list index -> `[i]`, key resolution -> `.<key>`, default value -> `(default)`
 ############################################
-PARTIAL_REF_PATTERN = re.compile(
-    r'(\${([^}:]+(?:\.[^}:]+)*)(?::([^}]+))?})'
-    r'|(\$([^$:]+(?:\.[^$:]+)*)(?::([^$]+))?\$)'
-)
+_KEY_SEGMENT = "<key>"
+_DEFAULT_SEGMENT = object()
+
+# Marks a key missing from a plain dict during a path walk
+_MISSING = object()
 
 
 def parse(data: Any) -> Any:
@@ -34,105 +43,151 @@ def parse(data: Any) -> Any:
     Parses internal references within any data structure (dict, list, or scalar).
     Returns a new structure with all references resolved. Raises CircularReferenceError on circular references.
     """
-    return _resolve(data, data, resolving_refs=set(), path="<root>")
+    return _resolve(data, data, resolving_refs=set(), lookup_cache={}, path=())
 
 
 def _resolve(
         node: Any,
         root_data: Any,
         resolving_refs: set,
-        path: str
+        lookup_cache: dict,
+        path: tuple
 ) -> Any:
     """Recursively resolves references within the node."""
-    if isinstance(node, dict):
-        resolved = {}
-        for k, v in node.items():
-            resolved_key = _resolve_string(k, root_data, resolving_refs, f"{path}.<key>")
-            child_path = f"{path}.{k}"
-            resolved[resolved_key] = _resolve(v, root_data, resolving_refs, child_path)
-        return resolved
-
-    elif isinstance(node, list):
-        resolved_list = []
-        for i, item in enumerate(node):
-            child_path = f"{path}[{i}]"
-            resolved_list.append(_resolve(item, root_data, resolving_refs, child_path))
-        return resolved_list
-
-    elif isinstance(node, str):
-        return _resolve_string(node, root_data, resolving_refs, path)
+    # Exact types hit the dispatch table; subclasses (e.g. custom dicts) fall back to isinstance
+    handler = _RESOLVERS.get(type(node))
+    if handler is None:
+        if isinstance(node, dict):
+            handler = _resolve_dict
+        elif isinstance(node, list):
+            handler = _resolve_list
+        elif isinstance(node, str):
+            handler = _resolve_string
+        else:
+            # int / float / bool / None / ...
+            return node
+    return handler(node, root_data, resolving_refs, lookup_cache, path)
 
-    else:
-        # int / float / bool / None / ...
-        return node
+
+def _resolve_dict(
+        node: dict,
+        root_data: Any,
+        resolving_refs: set,
+        lookup_cache: dict,
+        path: tuple
+) -> dict:
+    """Resolves both the keys and the values of a dict."""
+    # Loop invariants are bound to locals once instead of being looked up for every item
+    resolve, resolve_key = _resolve, _resolve_string
+    key_path = path + (_KEY_SEGMENT,)
+
+    resolved = {}
+    for k, v in node.items():
+        resolved_key = resolve_key(k, root_data, resolving_refs, lookup_cache, key_path)
+        child_path = path + (k,)
+        resolved[resolved_key] = resolve(v, root_data, resolving_refs, lookup_cache, child_path)
+    return resolved
+
+
+def _resolve_list(
+        node: list,
+        root_data: Any,
+        resolving_refs: set,
+        lookup_cache: dict,
+        path: tuple
+) -> list:
+    """Resolves every item of a list."""
+    # Built in one comprehension; the input list itself is never mutated
+    return [
+        _resolve(item, root_data, resolving_refs, lookup_cache, path + (i,))
+        for i, item in enumerate(node)
+    ]
 
 
 def _resolve_string(
         text: str,
         root_data: Any,
         resolving_refs: set,
-        path: str,
+        lookup_cache: dict,
+        path: tuple,
 ) -> Any:
     """
     Determines if the entire string is a "full reference" (with an optional `$`).
     If so, returns the resolved original type (e.g., int).
     Otherwise, treats it as a string with partial references and performs in-place replacements, returning a string.
     """
-    # 1) First, check if FULL_REF_PATTERN matches the entire string
-    m_full = FULL_REF_PATTERN.match(text)
-    if m_full:
-        # If the entire string is a complete reference
-        # Group order as per FULL_REF_PATTERN
-        ref_path_curly = m_full.group(2)  # Internal path within \${...}
-        default_curly = m_full.group(3)    # \${...:default}
-        trailing_dollar = m_full.group(4)  # Optional trailing $
-        ref_path_dollar = m_full.group(5)  # Internal path within $...$
-        default_dollar = m_full.group(6)    # $...:default$
-
-        if ref_path_curly is not None:
-            ref_path = ref_path_curly
-            default_value = default_curly
-        else:
-            ref_path = ref_path_dollar
-            default_value = default_dollar
+    # Both reference forms start with `$`; plain strings skip the regex engine entirely
+    if '$' not in text:
+        return text
 
-        return _lookup_ref(ref_path, default_value, root_data, resolving_refs, path)
+    # 1) If the entire string is a complete reference, return the referenced value as-is
+    m_full = _match_full_ref(text)
+    if m_full is not None:
+        ref_path, default_value = _ref_of(m_full)
+        return _lookup_ref(ref_path, default_value, root_data, resolving_refs, lookup_cache, path)
 
     # 2) Otherwise, perform "partial replacement"
-    matches = list(PARTIAL_REF_PATTERN.finditer(text))
-    if not matches:
-        return text  # No references found, return as-is
-
-    result_parts = []
-    last_end = 0
-    for m in matches:
-        start_idx = m.start()
-        end_idx = m.end()
-        # Add the original text before this reference
-        result_parts.append(text[last_end:start_idx])
-
-        # group(2) = internal path within \${path}
-        # group(3) = default within \${path:default}
-        # group(5) = internal path within $path$
-        # group(6) = default within $path:default$
-        if m.group(1):  # \${...} form
-            ref_path = m.group(2)
-            default_value = m.group(3)
-        else:  # $...$ form
-            ref_path = m.group(5)
-            default_value = m.group(6)
-
-        ref_value = _lookup_ref(ref_path, default_value, root_data, resolving_refs, path)
-        # Treat partial replacements as string concatenation
-        result_parts.append(str(ref_value))
+    return _substitute_refs(text, root_data, resolving_refs, lookup_cache, path)
+
 
-        last_end = end_idx
+def _substitute_refs(
+        text: str,
+        root_data: Any,
+        resolving_refs: set,
+        lookup_cache: dict,
+        path: tuple,
+) -> str:
+    """Replaces every reference within a text already known not to be a full reference, in a single `sub` pass."""
+    def _replace(m: re.Match) -> str:
+        ref_path, default_value = _ref_of(m)
+        # Treat partial replacements as string concatenation
+        return str(_lookup_ref(ref_path, default_value, root_data, resolving_refs, lookup_cache, path))
 
-    # Add the remaining text after the last reference
-    result_parts.append(text[last_end:])
+    return _sub_refs(_replace, text)
 
-    return "".join(result_parts)
 
+def _match_full_ref(text: str) -> Optional[re.Match]:
+    """
+    Returns the match if the entire text is a single reference, else None.
+    The match must cover the whole string, with an optional trailing `$` for the `${...}` form
+    and an optional final newline.
+    """
+    m = _search_ref(text)
+    if m is None:
+        return None
+    # Like a `$` regex anchor, the end of the text may be followed by one final newline (e.g. YAML `|` scalars)
+    body_end = len(text) - 1 if text[-1] == '\n' else len(text)
+    if m.start() == 0:
+        end_idx = m.end()
+        if end_idx == len(text) or end_idx == body_end or (
+                m.group(1) and end_idx == body_end - 1 and text[body_end - 1] == '$'
+        ):
+            return m
+    # The leftmost match does not span the text, but another split of it still may
+    if text[0] == '$' and text[body_end - 1:body_end] in ('$', '}'):
+        return _fullmatch_ref(text) or _fullmatch_ref(text, 0, body_end)
+    return None
+
+
+def _ref_of(m: re.Match) -> Tuple[str, Optional[str]]:
+    """Extracts (ref_path, default_value) from a PARTIAL_REF_PATTERN match."""
+    # Fetch all groups in one call:
+    # group(2) = internal path within \${path}
+    # group(3) = default within \${path:default}
+    # group(5) = internal path within $path$
+    # group(6) = default within $path:default$
+    _, ref_path_curly, default_curly, _, ref_path_dollar, default_dollar = m.groups()
+    if ref_path_curly is not None:  # \${...} form
+        return ref_path_curly, default_curly
+    return ref_path_dollar, default_dollar  # $...$ form
+
+
+# Handlers for the exact container/string types, looked up by `type(node)` in `_resolve`
+_RESOLVERS = {
+    dict: _resolve_dict,
+    list: _resolve_list,
+    str: _resolve_string,
+}
 
 
 def _lookup_ref(
@@ -140,13 +195,14 @@ def _lookup_ref(
         default_value: str,
         root_data: Any,
         resolving_refs: set,
-        path: str,
+        lookup_cache: dict,
+        path: tuple,
 ) -> Any:
     """
     Given a path like "a.x.y" or "my_list.0", retrieves the corresponding value from root_data.
     Supports:
       - Dict key access
-      - List index access (if the segment k is purely numeric, it is converted to int for indexing)
+      - List / tuple index access (if the segment k is purely numeric, it is converted to int for indexing)
       - Custom classes implementing the __getitem__ method
     If the key/index is not found and a default_value exists, uses the default_value.
     If not found and no default is provided, raises ReferenceError.
@@ -155,52 +211,126 @@ def _lookup_ref(
     New Features:
       - Automatically parses the type of default values
       - Supports more types of indexing
+      - Follows chains of full references iteratively, without one stack frame per link
     """
-    # Check if this ref_path is already being resolved to prevent circular references
-    if ref_path in resolving_refs:
-        raise CircularReferenceError(f"Circular reference detected: '{ref_path}' is being referenced again in path '{path}'.")
+    # Chains like a -> b -> c (each value being a full reference) are followed in this loop instead of
+    # recursing once per link; every ref_path of the chain stays marked until the chain ends
+    followed = []
+    try:
+        while True:
+            # Check if this ref_path is already being resolved to prevent circular references
+            if ref_path in resolving_refs:
+                raise CircularReferenceError(f"Circular reference detected: '{ref_path}' is being referenced again in path '{_format_path(path)}'.")
+
+            resolving_refs.add(ref_path)
+            followed.append(ref_path)
 
-    resolving_refs.add(ref_path)
+            try:
+                current_value = _walk_ref(ref_path, root_data, lookup_cache)
+            except (KeyError, IndexError, TypeError):
+                # If index out of range or key doesn't exist, use default_value if provided, else raise error
+                if default_value is not None:
+                    # default_value might contain references and needs to be resolved
+                    resolved_default = _resolve(default_value, root_data, resolving_refs, lookup_cache, path + (_DEFAULT_SEGMENT,))
+                    # Attempt to automatically parse the type of default_value
+                    return _parse_default_value(resolved_default)
+                raise ReferenceError(f"Reference '{ref_path}' not found in path '{_format_path(path)}'.")
+
+            path = path + (ref_path,)
+            if type(current_value) is str:
+                if '$' not in current_value:
+                    return current_value
+                m_full = _match_full_ref(current_value)
+                if m_full is not None:
+                    ref_path, default_value = _ref_of(m_full)
+                    continue
+                # A partial template: substitute right away instead of re-checking it in `_resolve_string`
+                return _substitute_refs(current_value, root_data, resolving_refs, lookup_cache, path)
+
+            # If current_value is found, perform another resolve in case it contains references
+            return _resolve(current_value, root_data, resolving_refs, lookup_cache, path)
+    finally:
+        resolving_refs.difference_update(followed)
+
+
+def _walk_ref(
+        ref_path: str,
+        root_data: Any,
+        lookup_cache: dict,
+) -> Any:
+    """
+    Walks root_data along the dotted ref_path and returns the raw (unresolved) value.
+    Raises KeyError / IndexError / TypeError if the path does not exist.
+    """
+    if ref_path in lookup_cache:
+        # The same path was walked before; root_data is never modified, so the value is still valid
+        return lookup_cache[ref_path]
 
     current_value = root_data
+    cacheable = True
     subkeys = ref_path.split(".") if ref_path else []
-    try:
-        for k in subkeys:
-            # If current_value is a list and k is purely numeric, convert to int index
-            if isinstance(current_value, list):
+    for k in subkeys:
+        if type(current_value) is dict:
+            # Plain dicts (the common case) are probed once, without raising on a hit
+            value = current_value.get(k, _MISSING)
+            if value is _MISSING:
+                # On a miss, go straight to attribute access (e.g. dict methods)
                 try:
-                    idx = int(k)
-                except ValueError:
+                    value = getattr(current_value, k)
+                except AttributeError:
+                    raise KeyError(k)
+
+        # If current_value is a list / tuple and k is purely numeric, convert to int index
+        elif isinstance(current_value, (list, tuple)):
+            if type(current_value) is not list and type(current_value) is not tuple:
+                # Subclasses may override __getitem__ to compute a new value on every access
+                cacheable = False
+            try:
+                idx = int(k)
+            except ValueError:
+                if not isinstance(current_value, tuple):
                     raise TypeError(f"Index '{k}' is not an integer and cannot be used for list.")
-                current_value = current_value[idx]
-                continue
+                # Tuples keep attribute access for non-numeric segments (e.g. namedtuple fields, `count`)
+                try:
+                    value = getattr(current_value, k)
+                except AttributeError:
+                    raise KeyError(k)
+            else:
+                value = current_value[idx]
 
+        else:
+            # Custom classes may compute a new value on every access (e.g. random strings)
+            cacheable = False
             try:
-                current_value = current_value[k]
+                value = current_value[k]
             except (KeyError, IndexError, TypeError, AttributeError, ValueError) as e:
                 # If key/index access fails, try using getattr for attribute access
                 try:
-                    current_value = getattr(current_value, k)
+                    value = getattr(current_value, k)
                 except AttributeError:
                     raise KeyError(k) from e
-    except (KeyError, IndexError, TypeError):
-        # If index out of range or key doesn't exist, use default_value if provided, else raise error
-        if default_value is not None:
-            # default_value might contain references and needs to be resolved
-            resolved_default = _resolve(default_value, root_data, resolving_refs, f"{path}(default)")
-            # Attempt to automatically parse the type of default_value
-            resolved_default = _parse_default_value(resolved_default)
-            resolving_refs.remove(ref_path)
-            return resolved_default
+        current_value = value
+
+    if cacheable:
+        lookup_cache[ref_path] = current_value
+    return current_value
+
+
+def _format_path(path: tuple) -> str:
+    """Renders a diagnostic path tuple, e.g. ("a", 0, "<key>") -> "<root>.a[0].<key>"."""
+    parts = ["<root>"]
+    for segment in path:
+        if segment is _DEFAULT_SEGMENT:
+            parts.append("(default)")
+        elif isinstance(segment, int):
+            parts.append(f"[{segment}]")
         else:
-            resolving_refs.remove(ref_path)
-            raise ReferenceError(f"Reference '{ref_path}' not found in path '{path}'.")
+            parts.append(f".{segment}")
+    return "".join(parts)
 
-    # If current_value is found, perform another resolve in case it contains references
-    resolved_value = _resolve(current_value, root_data, resolving_refs, f"{path}.{ref_path}")
 
-    resolving_refs.remove(ref_path)
-    return resolved_value
+# Non-numeric looking words that float() still accepts
+_FLOAT_WORDS = frozenset(("inf", "infinity", "nan"))
 
 
 def _parse_default_value(value: Any) -> Any:
@@ -220,16 +350,19 @@ def _parse_default_value(value: Any) -> Any:
         elif lower_val == "null":
             return None
         else:
-            # Attempt to parse as int
-            try:
-                return int(value)
-            except ValueError:
-                pass
-            # Attempt to parse as float
-            try:
-                return float(value)
-            except ValueError:
-                pass
+            # Raising ValueError is costly; only try int/float on text that can be numeric at all
+            head = value.lstrip()[:1]
+            if head.isdigit() or head in ('+', '-', '.') or lower_val.strip() in _FLOAT_WORDS:
+                # Attempt to parse as int
+                try:
+                    return int(value)
+                except ValueError:
+                    pass
+                # Attempt to parse as float
+                try:
+                    return float(value)
+                except ValueError:
+                    pass
             # Keep as string
             return value
     else: